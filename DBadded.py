@@ -1,14 +1,14 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import os
 import pickle
 from dotenv import load_dotenv
+import metrics
+import backends
+import locators
+from snapshots import save_snapshot
 
 # Load environment variables
 load_dotenv()
@@ -52,36 +52,24 @@ def load_cookies(driver):
         print(f"⚠️ Failed to load cookies: {str(e)}")
         return False
 
-def setup_chrome():
-    options = Options()
-    # Set headless mode based on environment variable (default to True)
-    headless = os.getenv('HEADLESS', 'True').lower() == 'true'
-    if headless:
-        options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-gpu')  # Often needed for headless mode
-    options.add_argument('--window-size=1920,1080')  # Set consistent window size
-    
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
-
 def check_session_validity(driver):
     """Check if the current session is valid by visiting dashboard"""
+    start = time.monotonic()
     try:
         driver.get("https://publish.buffer.com/all-channels")
         time.sleep(3)
         
         if "publish.buffer.com" in driver.current_url:
             print("✅ Session is valid!")
-            return True
+            valid = True
         else:
             print("⚠️ Session is invalid or expired")
-            return False
+            valid = False
     except Exception as e:
         print(f"⚠️ Session validation failed: {str(e)}")
-        return False
+        valid = False
+    metrics.observe('buffer_session_validation_seconds', time.monotonic() - start, valid=str(valid).lower())
+    return valid
 
 def login_with_credentials(driver, EMAIL, PASSWORD):
     """Perform login using credentials"""
@@ -92,7 +80,7 @@ def login_with_credentials(driver, EMAIL, PASSWORD):
         # Handle potential cookie consent
         try:
             WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Accept')]"))
+                EC.element_to_be_clickable((By.XPATH, locators.COOKIE_ACCEPT_BUTTON))
             ).click()
             print("Accepted cookies")
         except:
@@ -103,13 +91,13 @@ def login_with_credentials(driver, EMAIL, PASSWORD):
             print("Looking for human verification...")
             # Wait for iframe to load
             iframe = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//iframe[contains(@title,'reCAPTCHA')]"))
+                EC.presence_of_element_located((By.XPATH, locators.RECAPTCHA_IFRAME))
             )
             driver.switch_to.frame(iframe)
             
             # Click checkbox inside iframe
             checkbox = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//div[@class='recaptcha-checkbox-checkmark']"))
+                EC.element_to_be_clickable((By.XPATH, locators.RECAPTCHA_CHECKBOX))
             )
             checkbox.click()
             print("Clicked CAPTCHA checkbox")
@@ -123,21 +111,23 @@ def login_with_credentials(driver, EMAIL, PASSWORD):
         
         print("Entering email...")
         email_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//input[@type='email']"))
+            EC.presence_of_element_located((By.XPATH, locators.EMAIL_INPUT))
         )
+        # Snapshot before the credentials are typed so they never end up on disk
+        save_snapshot(driver, "login")
         email_field.clear()
         email_field.send_keys(EMAIL)
         
         print("Entering password...")
         password_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//input[@type='password']"))
+            EC.presence_of_element_located((By.XPATH, locators.PASSWORD_INPUT))
         )
         password_field.clear()
         password_field.send_keys(PASSWORD)
         
         print("Clicking login...")
         login_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']"))
+            EC.element_to_be_clickable((By.XPATH, locators.LOGIN_BUTTON))
         )
         login_button.click()
         
@@ -148,7 +138,7 @@ def login_with_credentials(driver, EMAIL, PASSWORD):
                 EC.or_(
                     EC.url_contains("publish.buffer.com"),
                     EC.url_contains("buffer.com/app"),
-                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(),'Invalid')]"))
+                    EC.presence_of_element_located((By.XPATH, locators.LOGIN_INVALID_MESSAGE))
                 )
             )
         except:
@@ -167,7 +157,7 @@ def login_with_credentials(driver, EMAIL, PASSWORD):
         else:
             # Check for error messages
             try:
-                error_element = driver.find_element(By.XPATH, "//*[contains(text(),'Invalid') or contains(text(),'incorrect')]")
+                error_element = driver.find_element(By.XPATH, locators.LOGIN_ERROR_MESSAGE)
                 error = error_element.text
                 print(f"❌ Login failed: {error}")
             except:
@@ -187,8 +177,15 @@ def main():
         if not EMAIL or not PASSWORD:
             raise ValueError("EMAIL and PASSWORD must be set in .env file")
         
+        metrics.start_metrics_server()
+        
+        # Restoring a session only needs cookies and navigation, so start the cheapest
+        # browser; without saved cookies go straight to one that can fill in the form
         print("Starting Chrome...")
-        driver = setup_chrome()
+        if os.path.exists(COOKIE_FILE):
+            driver = backends.start_cheapest(backends.VALIDATE_BACKENDS)
+        else:
+            driver = backends.start_cheapest(backends.LOGIN_BACKENDS)
         
         # First try to load existing session cookies
         session_valid = False
@@ -196,16 +193,26 @@ def main():
             # Check if session is still valid
             if check_session_validity(driver):
                 print("🚀 Session restored successfully!")
+                metrics.inc('buffer_logins_total', method='cookies', result='success')
                 session_valid = True
             else:
                 print("⚠️ Session expired. Proceeding with credential login...")
+                metrics.inc('buffer_logins_total', method='cookies', result='expired')
         
         # If session is invalid or doesn't exist, login with credentials
         if not session_valid:
+            # Filling in the login form needs element lookups
+            if not driver.finds_elements:
+                driver.quit()
+                driver = backends.start_cheapest(backends.LOGIN_BACKENDS)
+            
             if login_with_credentials(driver, EMAIL, PASSWORD):
                 print("🚀 Login successful! Session is active.")
+                metrics.inc('buffer_logins_total', method='credentials', result='success')
             else:
                 print("❌ Login failed. Please check credentials.")
+                metrics.inc('buffer_logins_total', method='credentials', result='failure')
+                driver.quit()
                 return None
         
         print("✅ Session established and cookies saved!")
@@ -215,6 +222,11 @@ def main():
         print(f"❌ Error: {str(e)}")
         if 'driver' in locals():
             take_screenshot(driver, "login_exception.png")
+            # A cdp browser is a bare Chrome process that would outlive the script
+            try:
+                driver.quit()
+            except Exception:
+                pass
         return None
 
 if __name__ == "__main__":
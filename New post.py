@@ -1,18 +1,20 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import os
 import pickle
-import glob
+import metrics
+import backends
+import captions
+import locators
+from snapshots import save_snapshot
+from verify import install_post_watcher, verify_post_created
+from steps import PostBudget, wait_for_xpath, run_step, run_steps
 
 # Cookie file path
 COOKIE_FILE = "buffer_cookies.pkl"
-VIDEO_DIR = "/workspaces/codespaces-blank/videos"
+# Same directory captions.py pre-renders (set with VIDEO_DIR)
+VIDEO_DIR = captions.VIDEO_DIR
 
 def take_screenshot(driver, filename):
     """Take a screenshot and save it"""
@@ -22,6 +24,24 @@ def take_screenshot(driver, filename):
     except Exception as e:
         print(f"⚠️ Failed to take screenshot: {str(e)}")
 
+def set_text(driver, element, text):
+    """Set the text of an input or contenteditable element in a single JS call"""
+    driver.execute_script("""
+        const el = arguments[0], text = arguments[1];
+        el.focus();
+        if (el.isContentEditable) {
+            // Replace the selection so the editor sees one input event
+            document.getSelection().selectAllChildren(el);
+            document.execCommand('insertText', false, text);
+        } else {
+            // Use the native setter so framework-controlled inputs pick up the value
+            const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, text);
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            el.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+    """, element, text)
+
 def load_cookies(driver):
     """Load cookies from file if exists"""
     if not os.path.exists(COOKIE_FILE):
@@ -59,44 +79,31 @@ def load_cookies(driver):
         print(f"⚠️ Failed to load cookies: {str(e)}")
         return False
 
-def setup_chrome():
-    options = Options()
-    # Set headless mode based on environment variable (default to True)
-    headless = os.getenv('HEADLESS', 'True').lower() == 'true'
-    if headless:
-        options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-gpu')  # Often needed for headless mode
-    options.add_argument('--window-size=1920,1080')  # Set consistent window size
-    
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+def setup_chrome(account=None, backend=None):
+    """Start a browser through the chosen backend (see backends.py)"""
+    # Reject cdp before Chrome is launched rather than after
+    if not backends.get_backend(backend).finds_elements:
+        raise ValueError("Posting needs a Selenium backend (selenium or headless-new)")
+    return backends.start(backend, account)
 
-def click_new_post(driver):
+def click_new_post(driver, budget=None):
     """Click on the New Post button"""
+    budget = budget or PostBudget()
     try:
         print("Navigating to all channels page...")
         driver.get("https://publish.buffer.com/all-channels")
-        time.sleep(3)
         
+        # The selector waits below also cover the page still loading
         print("Looking for New Post button...")
         # Try multiple selectors for the New Post button
-        selectors = [
-            "/html/body/div[1]/div[1]/main/div[1]/header/div[1]/div/button[2]",  # Provided XPath
-            "//button[contains(text(), 'New Post')]",  # Text-based selector
-            "//button[.//span[contains(text(), 'New Post')]]",  # Span inside button
-            "//button[contains(@class, 'new-post')]",  # Class-based selector
-            "//button[.//*[name()='svg']]"  # Button with SVG icon
-        ]
+        selectors = locators.NEW_POST_BUTTONS
         
         new_post_button = None
-        for selector in selectors:
+        for attempt, selector in enumerate(selectors):
+            if attempt:
+                metrics.inc('buffer_step_retries_total', step='click_new_post')
             try:
-                new_post_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
+                new_post_button = wait_for_xpath(driver, budget, selector, 5, clickable=True)
                 print(f"Found New Post button using selector: {selector}")
                 break
             except:
@@ -107,17 +114,15 @@ def click_new_post(driver):
             take_screenshot(driver, "new_post_button_not_found.png")
             return False
         
+        save_snapshot(driver, "all-channels")
+        
         print("Clicking New Post button...")
         new_post_button.click()
         
+        # Wait for the dialog to open by checking for elements that should appear
         print("Waiting for New Post dialog to open...")
-        time.sleep(3)
-        
-        # Verify the dialog opened by checking for elements that should appear
         try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'composer') or contains(text(), 'Create a new post')]"))
-            )
+            wait_for_xpath(driver, budget, locators.COMPOSER_DIALOG)
             print("✅ New Post dialog opened successfully!")
             return True
         except:
@@ -130,48 +135,72 @@ def click_new_post(driver):
         take_screenshot(driver, "new_post_error.png")
         return False
 
-def upload_video(driver):
+def record_upload(video_path, elapsed):
+    """Record upload size and throughput metrics"""
+    size = os.path.getsize(video_path)
+    metrics.inc('buffer_upload_bytes_total', size)
+    if elapsed > 0:
+        metrics.observe('buffer_upload_throughput_bytes_per_second', size / elapsed)
+
+def upload_finished(driver):
+    """Return the time the upload was seen to finish, or False while it's still running"""
+    # A progress bar that has disappeared, or a completion message or thumbnail;
+    # any_of swallows the lookup error when the completion element isn't there
+    finished = EC.any_of(
+        EC.invisibility_of_element_located((By.XPATH, locators.UPLOAD_PROGRESS)),
+        EC.presence_of_element_located((By.XPATH, locators.UPLOAD_COMPLETE)),
+    )
+    if finished(driver):
+        return time.monotonic()
+    return False
+
+def find_video():
+    """Return the first video file in the videos directory"""
+    video_files = captions.list_videos(VIDEO_DIR)
+    if not video_files:
+        return None
+    return video_files[0]
+
+def upload_video(driver, video_path=None, budget=None):
     """Upload a video from the videos directory"""
+    budget = budget or PostBudget()
     try:
-        # Get the first video file in the directory
-        video_files = glob.glob(os.path.join(VIDEO_DIR, "*.mp4"))
-        if not video_files:
+        video_path = video_path or find_video()
+        if not video_path:
             print(f"❌ No video files found in {VIDEO_DIR}")
             return False
         
-        video_path = video_files[0]
         print(f"Found video: {video_path}")
         
         # Find the file input element (it's usually hidden)
         print("Looking for file input element...")
-        file_input = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//input[@type='file']"))
-        )
+        file_input = wait_for_xpath(driver, budget, locators.FILE_INPUT)
         
         # Send the file path to the input element
         print("Uploading video...")
+        upload_start = time.monotonic()
         file_input.send_keys(video_path)
         
         # Wait for upload to complete (look for progress indicator or completion message)
         print("Waiting for upload to complete...")
-        time.sleep(5)  # Initial wait
+        try:
+            # The progress bar takes a moment to appear; don't check for it disappearing too early
+            budget.wait(driver, 10).until(EC.any_of(
+                EC.presence_of_element_located((By.XPATH, locators.UPLOAD_PROGRESS)),
+                EC.presence_of_element_located((By.XPATH, locators.UPLOAD_COMPLETE))
+            ))
+        except:
+            pass
         
         # Check for upload completion indicators
         try:
-            # Look for a progress bar that disappears or a completion message
-            WebDriverWait(driver, 120).until(
-                EC.invisibility_of_element_located((By.XPATH, "//div[contains(@class, 'upload-progress')]"))
-            )
+            # The wait returns the moment completion was seen, so throughput excludes polling
+            upload_end = budget.wait(driver, 120).until(upload_finished)
             print("✅ Video upload completed!")
+            record_upload(video_path, upload_end - upload_start)
         except:
-            # Alternative: Check for a success message or thumbnail
-            try:
-                WebDriverWait(driver, 120).until(
-                    EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'media-preview') or contains(text(), 'Upload complete')]"))
-                )
-                print("✅ Video upload completed!")
-            except:
-                print("⚠️ Could not confirm upload completion, but proceeding anyway")
+            print("⚠️ Could not confirm upload completion, but proceeding anyway")
+            metrics.inc('buffer_step_failures_total', step='upload_video_confirm')
         
         take_screenshot(driver, "video_uploaded.png")
         return True
@@ -181,18 +210,18 @@ def upload_video(driver):
         take_screenshot(driver, "video_upload_error.png")
         return False
 
-def type_content(driver):
+def type_content(driver, text, budget=None):
     """Type the content in the text area"""
+    budget = budget or PostBudget()
     try:
         print("Looking for text area...")
-        text_area = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "/html/body/div[2]/div/div[1]/div/div[2]/section[3]/div/div/div/div[1]/div[1]/div[1]/div/div"))
-        )
+        text_area = wait_for_xpath(driver, budget, locators.CAPTION_TEXT_AREA)
+        
+        save_snapshot(driver, "composer")
         
         print("Typing content...")
         text_area.click()
-        text_area.clear()
-        text_area.send_keys("#viral #Reels")
+        set_text(driver, text_area, text)
         
         print("✅ Content typed successfully!")
         take_screenshot(driver, "content_typed.png")
@@ -203,13 +232,12 @@ def type_content(driver):
         take_screenshot(driver, "content_type_error.png")
         return False
 
-def click_customize_button(driver):
+def click_customize_button(driver, budget=None):
     """Click the 'Customize for each network' button"""
+    budget = budget or PostBudget()
     try:
         print("Looking for Customize button...")
-        customize_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "/html/body/div[2]/div/div[1]/div/div[2]/section[4]/div/button"))
-        )
+        customize_button = wait_for_xpath(driver, budget, locators.CUSTOMIZE_BUTTON, clickable=True)
         
         print("Clicking Customize button...")
         customize_button.click()
@@ -223,13 +251,14 @@ def click_customize_button(driver):
         take_screenshot(driver, "customize_error.png")
         return False
 
-def click_second_text_area(driver):
+def click_second_text_area(driver, budget=None):
     """Click on the second additional text area"""
+    budget = budget or PostBudget()
     try:
         print("Looking for second text area...")
-        text_area = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "/html/body/div[2]/div/div[1]/div/div[2]/section[3]/div[2]/div[2]/div/div[2]/div/div/div/div/div"))
-        )
+        text_area = wait_for_xpath(driver, budget, locators.SECOND_TEXT_AREA, clickable=True)
+        
+        save_snapshot(driver, "composer-customized")
         
         print("Clicking second text area...")
         text_area.click()
@@ -243,18 +272,16 @@ def click_second_text_area(driver):
         take_screenshot(driver, "second_text_area_error.png")
         return False
 
-def fill_reels_input(driver):
+def fill_reels_input(driver, text, budget=None):
     """Fill the reels input field"""
+    budget = budget or PostBudget()
     try:
         print("Looking for reels input field...")
-        reels_input = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "/html/body/div[2]/div/div[1]/div/div[2]/section[3]/div[2]/div[2]/div/div[4]/div/div[1]/div/input"))
-        )
+        reels_input = wait_for_xpath(driver, budget, locators.REELS_INPUT)
         
         print("Filling reels input...")
         reels_input.click()
-        reels_input.clear()
-        reels_input.send_keys("#reels")
+        set_text(driver, reels_input, text)
         
         print("✅ Reels input filled successfully!")
         take_screenshot(driver, "reels_input_filled.png")
@@ -265,13 +292,12 @@ def fill_reels_input(driver):
         take_screenshot(driver, "reels_input_error.png")
         return False
 
-def click_section_button(driver):
+def click_section_button(driver, budget=None):
     """Click on the button in section 4"""
+    budget = budget or PostBudget()
     try:
         print("Looking for section button...")
-        section_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "/html/body/div[2]/div/div[1]/div/div[2]/section[4]/div/div[2]/div/div/div/div/div/div[1]"))
-        )
+        section_button = wait_for_xpath(driver, budget, locators.SECTION_BUTTON, clickable=True)
         
         print("Clicking section button...")
         section_button.click()
@@ -285,13 +311,14 @@ def click_section_button(driver):
         take_screenshot(driver, "section_button_error.png")
         return False
 
-def click_list_item(driver):
+def click_list_item(driver, budget=None):
     """Click on the list item"""
+    budget = budget or PostBudget()
     try:
         print("Looking for list item...")
-        list_item = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "/html/body/div[2]/div/div[1]/div/div[2]/section[4]/div/div[2]/div/div/div/div/div/div[2]/ul/li[1]/div/p"))
-        )
+        list_item = wait_for_xpath(driver, budget, locators.LIST_ITEM, clickable=True)
+        
+        save_snapshot(driver, "composer-menu")
         
         print("Clicking list item...")
         list_item.click()
@@ -305,56 +332,61 @@ def click_list_item(driver):
         take_screenshot(driver, "list_item_error.png")
         return False
 
+def create_post(driver, video_path, budget=None, network=captions.NETWORK, cancelled=None):
+    """Run every posting step for one video and return the confirmed post, or None"""
+    budget = budget or PostBudget()
+    try:
+        post_captions = captions.get_captions(video_path, network)
+    except ValueError as e:
+        print(f"❌ Failed to render captions: {str(e)}")
+        metrics.inc('buffer_posts_total', result='failure')
+        return None
+    post = {'id': None}
+    
+    # Run the posting steps against a shared time budget
+    steps = [
+        (click_new_post, (budget,), "❌ Failed to click New Post button"),
+        (install_post_watcher, (), "❌ Failed to watch for post confirmation"),
+        (upload_video, (video_path, budget), "❌ Failed to upload video"),
+        (type_content, (post_captions['caption'], budget), "❌ Failed to type content"),
+        (click_customize_button, (budget,), "❌ Failed to click customize button"),
+        (click_second_text_area, (budget,), "❌ Failed to click second text area"),
+        (fill_reels_input, (post_captions['reels'], budget), "❌ Failed to fill reels input"),
+        (click_section_button, (budget,), "❌ Failed to click section button"),
+        (click_list_item, (budget,), "❌ Failed to click list item"),
+        (verify_post_created, (post, budget), "❌ Post was not confirmed as created"),
+    ]
+    if not run_steps(driver, steps, budget, cancelled):
+        metrics.inc('buffer_posts_total', result='failure')
+        return None
+    
+    metrics.inc('buffer_posts_total', result='success')
+    return post
+
 def main():
     try:
+        metrics.start_metrics_server()
+        
         print("Starting Chrome...")
         driver = setup_chrome()
+        budget = PostBudget()
         
         # Load existing session cookies
-        if not load_cookies(driver):
+        if not run_step(driver, load_cookies):
             print("❌ No session cookies found. Please run login.py first.")
+            metrics.inc('buffer_posts_total', result='failure')
             return None
         
         print("🚀 Session restored successfully!")
         
-        # Click the New Post button
-        if not click_new_post(driver):
-            print("❌ Failed to click New Post button")
-            return None
-        
-        # Upload video
-        if not upload_video(driver):
-            print("❌ Failed to upload video")
-            return None
-        
-        # Type content
-        if not type_content(driver):
-            print("❌ Failed to type content")
-            return None
-        
-        # Click customize button
-        if not click_customize_button(driver):
-            print("❌ Failed to click customize button")
-            return None
-        
-        # Click second text area
-        if not click_second_text_area(driver):
-            print("❌ Failed to click second text area")
-            return None
-        
-        # Fill reels input
-        if not fill_reels_input(driver):
-            print("❌ Failed to fill reels input")
-            return None
-        
-        # Click section button
-        if not click_section_button(driver):
-            print("❌ Failed to click section button")
+        # Pick the video to post
+        video_path = find_video()
+        if not video_path:
+            print(f"❌ No video files found in {VIDEO_DIR}")
+            metrics.inc('buffer_posts_total', result='failure')
             return None
         
-        # Click list item
-        if not click_list_item(driver):
-            print("❌ Failed to click list item")
+        if not create_post(driver, video_path, budget):
             return None
         
         print("\n🚀 All steps completed successfully!")
@@ -362,6 +394,7 @@ def main():
             
     except Exception as e:
         print(f"❌ Error: {str(e)}")
+        metrics.inc('buffer_posts_total', result='error')
         if 'driver' in locals():
             take_screenshot(driver, "main_exception.png")
         return None
@@ -0,0 +1,369 @@
+import os
+import sys
+import json
+import time
+import base64
+import shutil
+import tempfile
+import subprocess
+import urllib.request
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+import profiles
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+# Backend used by start() unless a caller picks one (selenium, headless-new, cdp)
+BROWSER_BACKEND = os.getenv('BROWSER_BACKEND', '')
+# Chrome binary for the CDP backend; found on PATH when unset
+CHROME_BINARY = os.getenv('CHROME_BINARY', '')
+# Seconds to wait for Chrome to start or a page to load over CDP
+CDP_TIMEOUT = 30
+
+# Cheapest first. Session validation only needs navigation and cookies; a
+# credential login needs element lookups, which the CDP driver doesn't offer.
+VALIDATE_BACKENDS = ['cdp', 'headless-new', 'selenium']
+LOGIN_BACKENDS = ['headless-new', 'selenium']
+
+def _headless():
+    return os.getenv('HEADLESS', 'True').lower() == 'true'
+
+def _profile_arguments(account):
+    account = account or profiles.profile_account()
+    return profiles.profile_arguments(account) if account else []
+
+class SeleniumChromeBackend:
+    """Full Chrome through chromedriver, with the flags the scripts have always used"""
+
+    name = 'selenium'
+    # Returns a WebDriver, so find_element and WebDriverWait work
+    finds_elements = True
+
+    def options(self):
+        options = Options()
+        # Set headless mode based on environment variable (default to True)
+        if _headless():
+            options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-gpu')  # Often needed for headless mode
+        options.add_argument('--window-size=1920,1080')  # Set consistent window size
+        return options
+
+    def start(self, account=None):
+        options = self.options()
+        # Reuse the account's profile so Buffer's assets load from cache
+        for argument in _profile_arguments(account):
+            options.add_argument(argument)
+        service = Service(ChromeDriverManager().install())
+        return webdriver.Chrome(service=service, options=options)
+
+class HeadlessNewBackend(SeleniumChromeBackend):
+    """Chrome's new headless mode through chromedriver with a minimal flag set"""
+
+    name = 'headless-new'
+
+    def options(self):
+        options = Options()
+        options.add_argument('--headless=new')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-background-networking')
+        options.add_argument('--no-first-run')
+        options.add_argument('--mute-audio')
+        options.add_argument('--window-size=1280,800')
+        return options
+
+class CDPDriver:
+    """Minimal driver speaking the DevTools protocol to Chrome, without chromedriver.
+
+    Covers what cookie restore and session validation need: get(), current_url,
+    title, cookies, execute_script(), save_screenshot() and quit().
+    """
+
+    def __init__(self, process, ws_url, temp_dir=None):
+        self.process = process
+        self.temp_dir = temp_dir
+        self.ws = websocket.create_connection(ws_url, timeout=CDP_TIMEOUT, suppress_origin=True)
+        self._next_id = 0
+        self._events = []
+        self._send('Page.enable')
+
+    def _send(self, method, **params):
+        self._next_id += 1
+        message_id = self._next_id
+        self.ws.send(json.dumps({'id': message_id, 'method': method, 'params': params}))
+        while True:
+            message = json.loads(self.ws.recv())
+            if message.get('id') == message_id:
+                if 'error' in message:
+                    raise RuntimeError(f"{method} failed: {message['error'].get('message')}")
+                return message.get('result', {})
+            if 'method' in message:
+                self._events.append(message)
+
+    def _wait_for_event(self, method, timeout=CDP_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while True:
+            for event in self._events:
+                if event['method'] == method:
+                    self._events.remove(event)
+                    return event
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Timed out waiting for {method}")
+            self.ws.settimeout(remaining)
+            try:
+                message = json.loads(self.ws.recv())
+            finally:
+                self.ws.settimeout(CDP_TIMEOUT)
+            if 'method' in message:
+                self._events.append(message)
+
+    def get(self, url):
+        self._events.clear()
+        result = self._send('Page.navigate', url=url)
+        if result.get('errorText'):
+            raise RuntimeError(f"Navigation to {url} failed: {result['errorText']}")
+        self._wait_for_event('Page.loadEventFired')
+
+    def execute_script(self, script, *args):
+        expression = f"(function() {{ {script} }}).apply(null, {json.dumps(list(args))})"
+        result = self._send('Runtime.evaluate', expression=expression, returnByValue=True, awaitPromise=True)
+        if 'exceptionDetails' in result:
+            raise RuntimeError(result['exceptionDetails'].get('text', 'Script failed'))
+        return result.get('result', {}).get('value')
+
+    @property
+    def current_url(self):
+        return self.execute_script("return location.href")
+
+    @property
+    def title(self):
+        return self.execute_script("return document.title")
+
+    def get_cookies(self):
+        """Return cookies in the same shape as Selenium's get_cookies()"""
+        cookies = []
+        for cookie in self._send('Network.getAllCookies')['cookies']:
+            converted = {
+                'name': cookie['name'],
+                'value': cookie['value'],
+                'domain': cookie['domain'],
+                'path': cookie['path'],
+                'secure': cookie['secure'],
+                'httpOnly': cookie['httpOnly'],
+            }
+            if cookie.get('expires', -1) > 0:
+                converted['expiry'] = int(cookie['expires'])
+            if cookie.get('sameSite'):
+                converted['sameSite'] = cookie['sameSite']
+            cookies.append(converted)
+        return cookies
+
+    def add_cookie(self, cookie):
+        """Set a cookie given in Selenium's format"""
+        params = {'name': cookie['name'], 'value': cookie['value'], 'path': cookie.get('path', '/')}
+        if cookie.get('domain'):
+            params['domain'] = cookie['domain']
+        else:
+            params['url'] = self.current_url
+        for key in ('secure', 'httpOnly'):
+            if key in cookie:
+                params[key] = cookie[key]
+        if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+            params['sameSite'] = cookie['sameSite']
+        if 'expiry' in cookie:
+            params['expires'] = cookie['expiry']
+        self._send('Network.setCookie', **params)
+
+    def save_screenshot(self, filename):
+        data = self._send('Page.captureScreenshot', format='png')['data']
+        with open(filename, 'wb') as f:
+            f.write(base64.b64decode(data))
+        return True
+
+    def quit(self):
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+class CDPBackend:
+    """Headless Chrome driven directly over the DevTools protocol"""
+
+    name = 'cdp'
+    finds_elements = False
+
+    def find_chrome(self):
+        if CHROME_BINARY:
+            return CHROME_BINARY
+        for candidate in ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome'):
+            path = shutil.which(candidate)
+            if path:
+                return path
+        raise RuntimeError("Chrome binary not found; set CHROME_BINARY")
+
+    def start(self, account=None):
+        if websocket is None:
+            raise RuntimeError("The cdp backend needs the websocket-client package")
+        arguments = _profile_arguments(account)
+        temp_dir = None
+        if not arguments:
+            temp_dir = tempfile.mkdtemp(prefix="buffer-cdp-")
+            arguments = [f'--user-data-dir={temp_dir}']
+        user_data_dir = arguments[0].split('=', 1)[1]
+        port_file = os.path.join(user_data_dir, 'DevToolsActivePort')
+        if os.path.exists(port_file):
+            os.remove(port_file)
+
+        process = subprocess.Popen(
+            [self.find_chrome(), '--headless=new', '--remote-debugging-port=0', '--no-sandbox',
+             '--disable-dev-shm-usage', '--disable-extensions', '--disable-background-networking',
+             '--no-first-run', '--no-default-browser-check', '--mute-audio'] + arguments + ['about:blank'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            # Chrome writes the port it picked once DevTools is listening
+            deadline = time.monotonic() + CDP_TIMEOUT
+            while True:
+                if os.path.exists(port_file):
+                    with open(port_file) as f:
+                        port = next(iter(f.read().split()), None)
+                    if port:
+                        break
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Chrome did not start DevTools")
+                time.sleep(0.05)
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/list", timeout=CDP_TIMEOUT) as response:
+                targets = json.load(response)
+            page = next(target for target in targets if target['type'] == 'page')
+            return CDPDriver(process, page['webSocketDebuggerUrl'], temp_dir)
+        except Exception:
+            process.kill()
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+BACKENDS = {backend.name: backend for backend in (SeleniumChromeBackend(), HeadlessNewBackend(), CDPBackend())}
+
+def get_backend(name=None):
+    """Return the named backend (BROWSER_BACKEND, then selenium, when not given)"""
+    name = name or BROWSER_BACKEND or 'selenium'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown browser backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]
+
+def start(name=None, account=None):
+    """Start the named backend (BROWSER_BACKEND, then selenium, when not given)"""
+    backend = get_backend(name)
+    driver = backend.start(account)
+    # Callers that got the driver from start_cheapest can still tell what it supports
+    driver.finds_elements = backend.finds_elements
+    return driver
+
+def start_cheapest(names, account=None):
+    """Start the first backend in the list that works; BROWSER_BACKEND overrides the list if it fits"""
+    if BROWSER_BACKEND in names:
+        names = [BROWSER_BACKEND]
+    elif not _headless():
+        # Only the classic backend can show a window, e.g. to solve a CAPTCHA by hand
+        names = ['selenium']
+    errors = []
+    for name in names:
+        try:
+            driver = start(name, account)
+            print(f"🌐 Using {name} browser backend")
+            return driver
+        except Exception as e:
+            print(f"⚠️ {name} backend unavailable: {str(e)}")
+            errors.append(f"{name}: {e}")
+    raise RuntimeError("No browser backend could start (" + "; ".join(errors) + ")")
+
+def _browser_pid(driver):
+    if isinstance(driver, CDPDriver):
+        return driver.process.pid
+    return driver.service.process.pid
+
+def _tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants, in MB (Linux only)"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+def compare(runs=3, url="https://login.buffer.com/login"):
+    """Measure startup time, page load time and memory for every backend"""
+    rows = []
+    for name in BACKENDS:
+        startups, loads, memory = [], [], []
+        for _ in range(runs):
+            start_time = time.monotonic()
+            try:
+                driver = start(name)
+            except Exception as e:
+                print(f"⚠️ {name} backend unavailable: {str(e)}")
+                break
+            try:
+                startups.append(time.monotonic() - start_time)
+                load_start = time.monotonic()
+                driver.get(url)
+                loads.append(time.monotonic() - load_start)
+                memory.append(_tree_rss_mb(_browser_pid(driver)))
+            finally:
+                driver.quit()
+        if startups and loads:
+            rows.append((name, sum(startups) / len(startups), sum(loads) / len(loads), max(memory)))
+
+    lines = [
+        f"Averages over {runs} runs loading {url}",
+        "",
+        "| Backend | Startup (s) | Page load (s) | Peak RSS (MB) |",
+        "| --- | --- | --- | --- |",
+    ]
+    lines += [f"| {name} | {startup:.2f} | {load:.2f} | {rss:.0f} |" for name, startup, load, rss in rows]
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != 'compare':
+        print("Usage: python backends.py compare [runs] [output.md]")
+        sys.exit(1)
+    report = compare(int(sys.argv[2]) if len(sys.argv) > 2 else 3)
+    print(report)
+    if len(sys.argv) > 3:
+        with open(sys.argv[3], 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(f"📝 Comparison written to {sys.argv[3]}")
@@ -0,0 +1,155 @@
+import os
+import sys
+import json
+import glob
+import hashlib
+from string import Template
+
+# Video directory and caption files
+VIDEO_DIR = os.getenv('VIDEO_DIR', "/workspaces/codespaces-blank/videos")
+TEMPLATE_FILE = os.getenv('CAPTION_TEMPLATES', "caption_templates.json")
+MANIFEST_FILE = "manifest.json"
+RENDERED_FILE = "captions_rendered.json"
+
+# Network the per-network fields are customized for
+NETWORK = os.getenv('NETWORK', 'instagram')
+
+# Used when no template file exists; matches the previously hardcoded captions
+DEFAULT_TEMPLATES = {
+    "fields": {
+        "caption": "#viral #Reels",
+        "reels": "#reels",
+    },
+    "networks": {},
+}
+
+_compiled = None
+_compiled_config = None
+
+def load_templates(path=TEMPLATE_FILE):
+    """Load caption templates from file, falling back to the defaults"""
+    if not os.path.exists(path):
+        return DEFAULT_TEMPLATES
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compile_templates(config):
+    """Compile every field template once, with per-network overrides merged in"""
+    # Fields missing from the config keep their default template
+    fields = dict(DEFAULT_TEMPLATES["fields"])
+    fields.update(config.get("fields", {}))
+    base = {field: Template(text) for field, text in fields.items()}
+    compiled = {None: base}
+    for network, fields in config.get("networks", {}).items():
+        merged = dict(base)
+        merged.update({field: Template(text) for field, text in fields.items()})
+        compiled[network] = merged
+    return compiled
+
+def get_compiled():
+    """Return the compiled templates, recompiling only when the template file changes"""
+    global _compiled, _compiled_config
+    config = load_templates()
+    if _compiled is None or config != _compiled_config:
+        _compiled = compile_templates(config)
+        _compiled_config = config
+    return _compiled
+
+def load_manifest(video_dir=VIDEO_DIR):
+    """Load per-video template variables keyed by file name"""
+    path = os.path.join(video_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def list_videos(video_dir=VIDEO_DIR):
+    """Return the queued videos in the order their $index is assigned"""
+    return sorted(glob.glob(os.path.join(video_dir, "*.mp4")))
+
+def video_index(video_path):
+    """Return a video's position among the videos in its directory"""
+    names = [os.path.basename(path) for path in list_videos(os.path.dirname(video_path))]
+    filename = os.path.basename(video_path)
+    return names.index(filename) if filename in names else 0
+
+def fingerprint(video_dir=VIDEO_DIR):
+    """Hash everything rendered captions depend on, to detect stale pre-rendered files"""
+    source = {
+        "templates": load_templates(),
+        "manifest": load_manifest(video_dir),
+        "videos": [os.path.basename(path) for path in list_videos(video_dir)],
+    }
+    return hashlib.sha256(json.dumps(source, sort_keys=True).encode('utf-8')).hexdigest()
+
+def video_variables(video_path, index, manifest):
+    """Build the template variables available for a video"""
+    filename = os.path.basename(video_path)
+    variables = {
+        "filename": filename,
+        "stem": os.path.splitext(filename)[0],
+        "index": index,
+    }
+    variables.update(manifest.get(filename, {}))
+    return variables
+
+def render(video_path, network=NETWORK, index=None, manifest=None, compiled=None):
+    """Render every caption field for one video; raises ValueError on unset variables"""
+    compiled = compiled or get_compiled()
+    manifest = load_manifest(os.path.dirname(video_path)) if manifest is None else manifest
+    index = video_index(video_path) if index is None else index
+    templates = compiled.get(network, compiled[None])
+    variables = video_variables(video_path, index, manifest)
+    captions = {}
+    for field, template in templates.items():
+        try:
+            captions[field] = template.substitute(variables)
+        except KeyError as e:
+            raise ValueError(
+                f"Caption field '{field}' uses ${e.args[0]}, which is not set for "
+                f"{os.path.basename(video_path)} in {MANIFEST_FILE}"
+            )
+    return captions
+
+def render_all(video_dir=VIDEO_DIR, networks=None):
+    """Render captions for every queued video ahead of time and save them"""
+    compiled = get_compiled()
+    manifest = load_manifest(video_dir)
+    networks = networks or [NETWORK]
+    rendered = {}
+    for index, video_path in enumerate(list_videos(video_dir)):
+        filename = os.path.basename(video_path)
+        try:
+            rendered[filename] = {
+                network: render(video_path, network, index, manifest, compiled)
+                for network in networks
+            }
+        except ValueError as e:
+            print(f"⚠️ Skipping {filename}: {str(e)}")
+    with open(os.path.join(video_dir, RENDERED_FILE), 'w', encoding='utf-8') as f:
+        json.dump({"fingerprint": fingerprint(video_dir), "videos": rendered}, f, ensure_ascii=False, indent=2)
+    return rendered
+
+def get_captions(video_path, network=NETWORK):
+    """Return pre-rendered captions for a video, rendering on the fly if missing or stale"""
+    video_dir = os.path.dirname(video_path)
+    path = os.path.join(video_dir, RENDERED_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                rendered = json.load(f)
+            if rendered.get("fingerprint") != fingerprint(video_dir):
+                print("⚠️ Pre-rendered captions are out of date, rendering on the fly")
+            else:
+                captions = rendered["videos"].get(os.path.basename(video_path), {}).get(network)
+                if captions:
+                    return captions
+        except Exception as e:
+            print(f"⚠️ Failed to read pre-rendered captions: {str(e)}")
+    return render(video_path, network)
+
+if __name__ == "__main__":
+    video_dir = sys.argv[1] if len(sys.argv) > 1 else VIDEO_DIR
+    networks = sys.argv[2].split(',') if len(sys.argv) > 2 else None
+    rendered = render_all(video_dir, networks)
+    print(f"✅ Rendered captions for {len(rendered)} videos into {os.path.join(video_dir, RENDERED_FILE)}")
@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import sqlite3
+
+# Shared job database; put it on a volume every worker host can reach
+JOBS_DB = os.getenv('JOBS_DB', "jobs.db")
+# Seconds a lease stays valid without a heartbeat
+LEASE_SECONDS = int(os.getenv('LEASE_SECONDS', '120'))
+# Attempts before a job is marked as failed for good
+MAX_ATTEMPTS = int(os.getenv('MAX_ATTEMPTS', '3'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_path TEXT NOT NULL,
+    network TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    error TEXT,
+    post_id TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+"""
+
+def connect(path=JOBS_DB):
+    """Open the job database, creating the schema if needed"""
+    # Rollback journal rather than WAL: WAL needs shared memory, which
+    # network file systems don't provide across hosts
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.executescript(SCHEMA)
+    # Databases created before post ids were recorded
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+    if 'post_id' not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN post_id TEXT")
+    return conn
+
+def enqueue(conn, video_path, network=None):
+    """Add a video to the queue and return the job id"""
+    now = time.time()
+    cursor = conn.execute(
+        "INSERT INTO jobs (video_path, network, created, updated) VALUES (?, ?, ?, ?)",
+        (os.path.abspath(video_path), network, now, now),
+    )
+    return cursor.lastrowid
+
+def lease(conn, worker_id, lease_seconds=LEASE_SECONDS):
+    """Claim the next queued job, or one whose lease has expired"""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # A worker died on the job's last allowed attempt; nobody may retry it
+        conn.execute(
+            """UPDATE jobs SET status = 'failed', lease_expires = NULL,
+                      error = COALESCE(error, 'Lease expired on the last attempt'), updated = ?
+               WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?""",
+            (now, now, MAX_ATTEMPTS),
+        )
+        row = conn.execute(
+            """SELECT * FROM jobs
+               WHERE (status = 'queued' OR (status = 'leased' AND lease_expires < ?))
+                 AND attempts < ?
+               ORDER BY id LIMIT 1""",
+            (now, MAX_ATTEMPTS),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            """UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?,
+                      attempts = attempts + 1, updated = ?
+               WHERE id = ?""",
+            (worker_id, now + lease_seconds, now, row['id']),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    job = dict(row)
+    job['attempts'] += 1
+    return job
+
+def heartbeat(conn, job_id, worker_id, lease_seconds=LEASE_SECONDS):
+    """Extend a lease; returns False if the worker no longer owns the job"""
+    now = time.time()
+    cursor = conn.execute(
+        """UPDATE jobs SET lease_expires = ?, updated = ?
+           WHERE id = ? AND worker = ? AND status = 'leased'""",
+        (now + lease_seconds, now, job_id, worker_id),
+    )
+    return cursor.rowcount == 1
+
+def complete(conn, job_id, worker_id, post_id=None):
+    """Mark a leased job as done, recording the Buffer post id if known"""
+    cursor = conn.execute(
+        """UPDATE jobs SET status = 'done', lease_expires = NULL, error = NULL, post_id = ?, updated = ?
+           WHERE id = ? AND worker = ? AND status = 'leased'""",
+        (post_id, time.time(), job_id, worker_id),
+    )
+    return cursor.rowcount == 1
+
+def fail(conn, job_id, worker_id, error):
+    """Record a failed attempt, requeueing the job until it runs out of attempts"""
+    cursor = conn.execute(
+        """UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                  lease_expires = NULL, error = ?, updated = ?
+           WHERE id = ? AND worker = ? AND status = 'leased'""",
+        (MAX_ATTEMPTS, error, time.time(), job_id, worker_id),
+    )
+    return cursor.rowcount == 1
+
+def release(conn, job_id, worker_id):
+    """Give a job back to the queue without counting the attempt"""
+    cursor = conn.execute(
+        """UPDATE jobs SET status = 'queued', lease_expires = NULL, attempts = attempts - 1, updated = ?
+           WHERE id = ? AND worker = ? AND status = 'leased'""",
+        (time.time(), job_id, worker_id),
+    )
+    return cursor.rowcount == 1
+
+def counts(conn):
+    """Return the number of jobs in each status"""
+    rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+    return {row['status']: row['n'] for row in rows}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ('enqueue', 'status'):
+        print("Usage: python jobqueue.py enqueue <video>... | status")
+        sys.exit(1)
+    conn = connect()
+    if sys.argv[1] == 'enqueue':
+        network = os.getenv('NETWORK')
+        for video_path in sys.argv[2:]:
+            job_id = enqueue(conn, video_path, network)
+            print(f"➕ Queued job {job_id}: {video_path}")
+    else:
+        for status, n in sorted(counts(conn).items()):
+            print(f"{status}: {n}")
@@ -0,0 +1,68 @@
+# XPath locators used by the login and posting scripts. Each locator is tagged
+# with the page snapshot it should match so replay.py can check it offline.
+
+# Login page
+COOKIE_ACCEPT_BUTTON = "//button[contains(text(),'Accept')]"
+RECAPTCHA_IFRAME = "//iframe[contains(@title,'reCAPTCHA')]"
+RECAPTCHA_CHECKBOX = "//div[@class='recaptcha-checkbox-checkmark']"
+EMAIL_INPUT = "//input[@type='email']"
+PASSWORD_INPUT = "//input[@type='password']"
+LOGIN_BUTTON = "//button[@type='submit']"
+LOGIN_INVALID_MESSAGE = "//*[contains(text(),'Invalid')]"
+LOGIN_ERROR_MESSAGE = "//*[contains(text(),'Invalid') or contains(text(),'incorrect')]"
+
+# All channels page
+NEW_POST_BUTTONS = [
+    "/html/body/div[1]/div[1]/main/div[1]/header/div[1]/div/button[2]",  # Provided XPath
+    "//button[contains(text(), 'New Post')]",  # Text-based selector
+    "//button[.//span[contains(text(), 'New Post')]]",  # Span inside button
+    "//button[contains(@class, 'new-post')]",  # Class-based selector
+    "//button[.//*[name()='svg']]"  # Button with SVG icon
+]
+
+# Composer
+COMPOSER_DIALOG = "//div[contains(@class, 'composer') or contains(text(), 'Create a new post')]"
+FILE_INPUT = "//input[@type='file']"
+UPLOAD_PROGRESS = "//div[contains(@class, 'upload-progress')]"
+UPLOAD_COMPLETE = "//div[contains(@class, 'media-preview') or contains(text(), 'Upload complete')]"
+CAPTION_TEXT_AREA = "/html/body/div[2]/div/div[1]/div/div[2]/section[3]/div/div/div/div[1]/div[1]/div[1]/div/div"
+CUSTOMIZE_BUTTON = "/html/body/div[2]/div/div[1]/div/div[2]/section[4]/div/button"
+
+# Composer after "Customize for each network"
+SECOND_TEXT_AREA = "/html/body/div[2]/div/div[1]/div/div[2]/section[3]/div[2]/div[2]/div/div[2]/div/div/div/div/div"
+REELS_INPUT = "/html/body/div[2]/div/div[1]/div/div[2]/section[3]/div[2]/div[2]/div/div[4]/div/div[1]/div/input"
+SECTION_BUTTON = "/html/body/div[2]/div/div[1]/div/div[2]/section[4]/div/div[2]/div/div/div/div/div/div[1]"
+
+# Composer with the section menu open
+LIST_ITEM = "/html/body/div[2]/div/div[1]/div/div[2]/section[4]/div/div[2]/div/div/div/div/div/div[2]/ul/li[1]/div/p"
+
+def _locator(name, xpath, page, required=True, group=None):
+    return {"name": name, "xpath": xpath, "page": page, "required": required, "group": group}
+
+# Every locator with the snapshot it belongs to. Optional locators (banners,
+# error messages) are reported but don't count as breakage; a group of fallback
+# selectors only breaks when none of them match. RECAPTCHA_CHECKBOX lives inside
+# the reCAPTCHA iframe and UPLOAD_PROGRESS only exists mid-upload, so neither
+# can be checked against a page snapshot.
+LOCATORS = [
+    _locator("COOKIE_ACCEPT_BUTTON", COOKIE_ACCEPT_BUTTON, "login", required=False),
+    _locator("RECAPTCHA_IFRAME", RECAPTCHA_IFRAME, "login", required=False),
+    _locator("EMAIL_INPUT", EMAIL_INPUT, "login"),
+    _locator("PASSWORD_INPUT", PASSWORD_INPUT, "login"),
+    _locator("LOGIN_BUTTON", LOGIN_BUTTON, "login"),
+    _locator("LOGIN_INVALID_MESSAGE", LOGIN_INVALID_MESSAGE, "login", required=False),
+    _locator("LOGIN_ERROR_MESSAGE", LOGIN_ERROR_MESSAGE, "login", required=False),
+] + [
+    _locator(f"NEW_POST_BUTTONS[{i}]", xpath, "all-channels", required=False, group="NEW_POST_BUTTONS")
+    for i, xpath in enumerate(NEW_POST_BUTTONS)
+] + [
+    _locator("COMPOSER_DIALOG", COMPOSER_DIALOG, "composer", required=False),
+    _locator("FILE_INPUT", FILE_INPUT, "composer"),
+    _locator("UPLOAD_COMPLETE", UPLOAD_COMPLETE, "composer", required=False),
+    _locator("CAPTION_TEXT_AREA", CAPTION_TEXT_AREA, "composer"),
+    _locator("CUSTOMIZE_BUTTON", CUSTOMIZE_BUTTON, "composer"),
+    _locator("SECOND_TEXT_AREA", SECOND_TEXT_AREA, "composer-customized"),
+    _locator("REELS_INPUT", REELS_INPUT, "composer-customized"),
+    _locator("SECTION_BUTTON", SECTION_BUTTON, "composer-customized"),
+    _locator("LIST_ITEM", LIST_ITEM, "composer-menu"),
+]
@@ -0,0 +1,166 @@
+import os
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Metrics endpoint port (set METRICS_PORT=0 to disable)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+# File written on exit for node_exporter's textfile collector (unset to disable)
+METRICS_TEXTFILE = os.getenv('METRICS_TEXTFILE', '')
+
+# Default histogram buckets in seconds
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Upload throughput buckets in bytes per second
+THROUGHPUT_BUCKETS = (64e3, 256e3, 1e6, 4e6, 16e6, 64e6)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_help = {}
+_server = None
+_textfile_registered = False
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+def counter(name, help_text):
+    """Register a counter so it shows up on the endpoint even before first use"""
+    with _lock:
+        _help[name] = ("counter", help_text)
+        _counters.setdefault(name, {})
+
+def histogram(name, help_text, buckets=DEFAULT_BUCKETS):
+    """Register a histogram with the given bucket bounds"""
+    with _lock:
+        _help[name] = ("histogram", help_text)
+        _histograms.setdefault(name, {"buckets": tuple(sorted(buckets)), "series": {}})
+
+def inc(name, amount=1, **labels):
+    """Increment a counter"""
+    with _lock:
+        series = _counters.setdefault(name, {})
+        key = _key(labels)
+        series[key] = series.get(key, 0) + amount
+
+def observe(name, value, **labels):
+    """Record a single observation in a histogram"""
+    with _lock:
+        hist = _histograms.setdefault(name, {"buckets": DEFAULT_BUCKETS, "series": {}})
+        key = _key(labels)
+        series = hist["series"].get(key)
+        if series is None:
+            series = {"counts": [0] * len(hist["buckets"]), "sum": 0.0, "count": 0}
+            hist["series"][key] = series
+        for i, bound in enumerate(hist["buckets"]):
+            if value <= bound:
+                series["counts"][i] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+@contextmanager
+def timed(name, **labels):
+    """Observe the duration of the wrapped block in seconds"""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        observe(name, time.monotonic() - start, **labels)
+
+def render():
+    """Render all metrics in the Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        for name, series in sorted(_counters.items()):
+            _, help_text = _help.get(name, ("counter", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(key)} {value}")
+        for name, hist in sorted(_histograms.items()):
+            _, help_text = _help.get(name, ("histogram", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, series in sorted(hist["series"].items()):
+                for bound, count in zip(hist["buckets"], series["counts"]):
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', repr(float(bound))))} {count}")
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {series['count']}")
+                lines.append(f"{name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{name}_count{_format_labels(key)} {series['count']}")
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep scrape requests out of the console output
+        pass
+
+def write_textfile(path=None):
+    """Write all metrics to a file, replacing it atomically so a scrape never sees half of it"""
+    path = path or METRICS_TEXTFILE
+    if not path:
+        return None
+    try:
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(render())
+        os.replace(temp_path, path)
+        return path
+    except OSError as e:
+        print(f"⚠️ Could not write metrics to {path}: {str(e)}")
+        return None
+
+def start_metrics_server(port=None):
+    """Serve /metrics on localhost in a background thread"""
+    global _server, _textfile_registered
+    # One-shot runs exit before a scrape, so keep their metrics in a file as well
+    if METRICS_TEXTFILE and not _textfile_registered:
+        atexit.register(write_textfile)
+        _textfile_registered = True
+    port = METRICS_PORT if port is None else port
+    if not port or _server is not None:
+        return _server
+    try:
+        _server = ThreadingHTTPServer(('127.0.0.1', port), _MetricsHandler)
+    except OSError as e:
+        print(f"⚠️ Could not start metrics endpoint on port {port}: {str(e)}")
+        return None
+    thread = threading.Thread(target=_server.serve_forever, daemon=True)
+    thread.start()
+    print(f"📊 Metrics available at http://127.0.0.1:{port}/metrics")
+    return _server
+
+# Metrics shared by the login and posting scripts
+counter('buffer_logins_total', 'Login attempts by method (cookies or credentials) and result')
+histogram('buffer_session_validation_seconds', 'Time spent validating a restored session')
+histogram('buffer_step_duration_seconds', 'Duration of each posting step')
+counter('buffer_step_failures_total', 'Posting step failures by step')
+counter('buffer_step_retries_total', 'Selector fallbacks and other retries by step')
+histogram('buffer_upload_throughput_bytes_per_second', 'Video upload throughput', THROUGHPUT_BUCKETS)
+counter('buffer_upload_bytes_total', 'Total bytes of video uploaded')
+counter('buffer_posts_total', 'Completed posting runs by result')
@@ -0,0 +1,151 @@
+import os
+import re
+import sys
+import time
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Reuse a Chrome profile per account instead of a throwaway one each run
+PERSISTENT_PROFILE = os.getenv('PERSISTENT_PROFILE', 'False').lower() == 'true'
+PROFILE_ROOT = os.getenv('PROFILE_ROOT', "chrome_profiles")
+# Size cap for each profile's caches, in megabytes
+PROFILE_MAX_MB = int(os.getenv('PROFILE_MAX_MB', '500'))
+
+# Cache folders inside a profile that are safe to prune
+CACHE_DIRS = [
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    os.path.join("Default", "Service Worker", "ScriptCache"),
+    os.path.join("Default", "GPUCache"),
+    "GrShaderCache",
+    "ShaderCache",
+]
+
+# Pages loaded by the pre-warm command; the publish app needs a logged-in session
+LOGIN_URL = "https://login.buffer.com/login"
+PUBLISH_URL = "https://publish.buffer.com/all-channels"
+
+def profile_account():
+    """Return the account whose profile should be used, or None when disabled"""
+    if not PERSISTENT_PROFILE:
+        return None
+    return os.getenv('BUFFER_ACCOUNT') or os.getenv('EMAIL') or "default"
+
+def worker_account(account, index):
+    """Return the profile name used by worker process `index` (Chrome locks a profile)"""
+    return f"{account}-{index}"
+
+def profile_dir(account):
+    """Return the profile directory for an account"""
+    name = re.sub(r'[^A-Za-z0-9._-]', '_', account)
+    return os.path.abspath(os.path.join(PROFILE_ROOT, name))
+
+def _cache_files(path):
+    files = []
+    for cache_dir in CACHE_DIRS:
+        for root, _, names in os.walk(os.path.join(path, cache_dir)):
+            for name in names:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, file_path))
+    return files
+
+def prune_profile(path, max_mb=PROFILE_MAX_MB):
+    """Delete the oldest cache files until the profile's caches fit under the size cap"""
+    limit = max_mb * 1024 * 1024
+    # Only cache files can be pruned, so only they count towards the cap
+    files = _cache_files(path)
+    size = sum(file_size for _, file_size, _ in files)
+    if size <= limit:
+        return 0
+    removed = 0
+    for _, file_size, file_path in sorted(files):
+        if size <= limit:
+            break
+        try:
+            os.remove(file_path)
+        except OSError:
+            continue
+        size -= file_size
+        removed += 1
+    print(f"🧹 Pruned {removed} cache files from {path} ({size / 1024 / 1024:.0f} MB of cache left)")
+    return removed
+
+def profile_arguments(account):
+    """Return the Chrome flags for the account's persistent profile with caching enabled"""
+    path = profile_dir(account)
+    os.makedirs(path, exist_ok=True)
+    prune_profile(path)
+    return [
+        f'--user-data-dir={path}',
+        '--profile-directory=Default',
+        # Keep Chrome's own HTTP cache under the cap so pruning rarely has to run
+        f'--disk-cache-size={PROFILE_MAX_MB * 1024 * 1024 // 2}',
+    ]
+
+def add_profile_arguments(options, account):
+    """Point Chrome at the account's persistent profile"""
+    for argument in profile_arguments(account):
+        options.add_argument(argument)
+    return profile_dir(account)
+
+def _prewarm_page(driver, url):
+    start = time.monotonic()
+    driver.get(url)
+    # Give the service worker a chance to install and cache the app shell
+    driver.execute_script("""
+        if (!('serviceWorker' in navigator)) { return null; }
+        return Promise.race([
+            navigator.serviceWorker.ready.then(() => true),
+            new Promise(resolve => setTimeout(resolve, 10000)),
+        ]).catch(() => null);
+    """)
+    print(f"✅ Loaded {url} in {time.monotonic() - start:.1f}s")
+
+def prewarm(account):
+    """Load Buffer once so later runs start from a warm HTTP and service worker cache"""
+    import backends
+    from login import load_cookies
+
+    print(f"Pre-warming profile for {account}...")
+    driver = backends.start(account=account)
+    warmed = False
+    try:
+        _prewarm_page(driver, LOGIN_URL)
+        # Without a session the publish app redirects to login and never gets cached
+        if not load_cookies(driver):
+            print("❌ No session cookies found, skipping publish.buffer.com. Please run login.py first.")
+        else:
+            _prewarm_page(driver, PUBLISH_URL)
+            if "publish.buffer.com" in driver.current_url:
+                warmed = True
+            else:
+                print("❌ Saved session is no longer valid, publish.buffer.com was not cached. Please run login.py.")
+    finally:
+        driver.quit()
+    prune_profile(profile_dir(account))
+    return warmed
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ('prewarm', 'prune'):
+        print("Usage: python profiles.py prewarm|prune [account] [worker_processes]")
+        sys.exit(1)
+    account = sys.argv[2] if len(sys.argv) > 2 else (os.getenv('BUFFER_ACCOUNT') or os.getenv('EMAIL') or "default")
+    # With a worker count, act on the per-worker profiles that worker.py uses
+    if len(sys.argv) > 3:
+        accounts = [worker_account(account, index) for index in range(int(sys.argv[3]))]
+    else:
+        accounts = [account]
+    if sys.argv[1] == 'prewarm':
+        results = [prewarm(name) for name in accounts]
+        if not all(results):
+            sys.exit(1)
+    else:
+        for name in accounts:
+            prune_profile(profile_dir(name))
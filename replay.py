@@ -0,0 +1,110 @@
+import os
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from lxml import html
+import locators
+import snapshots
+
+# Evaluations per locator when timing, to smooth out noise
+TIMING_ROUNDS = 5
+
+def find_snapshots(paths):
+    """Collect (page, file) pairs from snapshot directories, searched recursively"""
+    found = []
+    for path in paths:
+        for file_path in sorted(glob.glob(os.path.join(path, "**", "*.html"), recursive=True)):
+            page = os.path.splitext(os.path.basename(file_path))[0]
+            found.append((page, file_path))
+    return found
+
+def check_snapshot(page, file_path):
+    """Evaluate every locator for a page against one snapshot"""
+    with open(file_path, 'rb') as f:
+        tree = html.fromstring(f.read())
+    results = []
+    for locator in locators.LOCATORS:
+        if locator["page"] != page:
+            continue
+        try:
+            start = time.perf_counter()
+            for _ in range(TIMING_ROUNDS):
+                matches = tree.xpath(locator["xpath"])
+            elapsed = (time.perf_counter() - start) / TIMING_ROUNDS
+            error = None
+        except Exception as e:
+            matches, elapsed, error = [], 0.0, str(e)
+        results.append({
+            "name": locator["name"],
+            "page": page,
+            "snapshot": file_path,
+            "matches": len(matches),
+            "ms": elapsed * 1000,
+            "required": locator["required"],
+            "group": locator["group"],
+            "error": error,
+        })
+    return results
+
+def find_breakage(results):
+    """Return (snapshot, name) pairs for required locators or groups with no match"""
+    broken = []
+    groups = {}
+    for result in results:
+        if result["group"]:
+            key = (result["snapshot"], result["group"])
+            groups[key] = groups.get(key, False) or result["matches"] > 0
+        elif result["required"] and result["matches"] == 0:
+            broken.append((result["snapshot"], result["name"]))
+    broken.extend(key for key, matched in groups.items() if not matched)
+    return broken
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every locator against recorded DOM snapshots")
+    parser.add_argument('paths', nargs='*', default=[snapshots.SNAPSHOT_DIR or "snapshots"],
+                        help="snapshot directories (searched recursively)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="parallel processes")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="don't fail when a page has no snapshot")
+    args = parser.parse_args()
+
+    found = find_snapshots(args.paths)
+    if not found:
+        print(f"❌ No snapshots found in {', '.join(args.paths)}")
+        return 1
+
+    pages = {page for page, _ in found}
+    missing = sorted({locator["page"] for locator in locators.LOCATORS} - pages)
+    for page in missing:
+        marker = "⚠️" if args.allow_missing else "❌"
+        print(f"{marker} No snapshot for page '{page}', its locators were not checked")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        batches = pool.map(check_snapshot, *zip(*found))
+        results = [result for batch in batches for result in batch]
+    total = time.perf_counter() - start
+
+    print(f"\n{'Locator':<24} {'Page':<20} {'Matches':>7} {'ms':>8}  Snapshot")
+    for result in sorted(results, key=lambda r: (r["page"], r["name"], r["snapshot"])):
+        status = f"{result['matches']:>7}" if result["error"] is None else "  error"
+        print(f"{result['name']:<24} {result['page']:<20} {status} {result['ms']:>8.3f}  {result['snapshot']}")
+        if result["error"]:
+            print(f"    {result['error']}")
+
+    broken = find_breakage(results)
+    print(f"\nChecked {len(results)} locator evaluations on {len(found)} snapshots in {total:.2f}s")
+    if broken:
+        for snapshot, name in broken:
+            print(f"❌ {name} no longer matches {snapshot}")
+        return 1
+    if missing and not args.allow_missing:
+        print(f"❌ Missing snapshots for {', '.join(missing)} (use --allow-missing to skip them)")
+        return 1
+    print("✅ All required locators match")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+import os
+
+# Where DOM snapshots are saved during runs (unset to disable)
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', '')
+
+def save_snapshot(driver, page):
+    """Save the current DOM under the page name so replay.py can check locators offline"""
+    if not SNAPSHOT_DIR:
+        return None
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        path = os.path.join(SNAPSHOT_DIR, f"{page}.html")
+        # Drop typed values from a copy of the page; locators never match on them
+        html = driver.execute_script("""
+            const copy = document.documentElement.cloneNode(true);
+            copy.querySelectorAll('input, textarea').forEach(field => {
+                field.removeAttribute('value');
+                field.textContent = '';
+            });
+            return copy.outerHTML;
+        """)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        return path
+    except Exception as e:
+        print(f"⚠️ Failed to save DOM snapshot {page}: {str(e)}")
+        return None
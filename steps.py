@@ -0,0 +1,64 @@
+import os
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+import metrics
+
+# Total time a single post may take across all of its steps
+POST_TIMEOUT = float(os.getenv('POST_TIMEOUT', '300'))
+# How often waits re-check the page (WebDriverWait defaults to 0.5s)
+POLL_INTERVAL = float(os.getenv('POLL_INTERVAL', '0.1'))
+
+class BudgetExhausted(Exception):
+    """Raised when a post has used up its total time budget"""
+
+class PostBudget:
+    """Latency budget shared by every step of a single post"""
+
+    def __init__(self, total=POST_TIMEOUT, poll=POLL_INTERVAL):
+        self.total = total
+        self.poll = poll
+        self.deadline = time.monotonic() + total
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exhausted(self):
+        return self.remaining() <= 0
+
+    def wait(self, driver, timeout):
+        """Return a WebDriverWait capped by both the step timeout and the remaining budget"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise BudgetExhausted(f"Post exceeded its {self.total:g}s budget")
+        return WebDriverWait(driver, min(timeout, remaining), poll_frequency=self.poll)
+
+def wait_for_xpath(driver, budget, xpath, timeout=10, clickable=False):
+    """Wait for an element by XPath, drawing the wait from the post budget"""
+    condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+    return budget.wait(driver, timeout).until(condition((By.XPATH, xpath)))
+
+def run_step(driver, step, *args):
+    """Run a single posting step, recording its duration and any failure"""
+    name = step.__name__
+    with metrics.timed('buffer_step_duration_seconds', step=name):
+        ok = step(driver, *args)
+    if not ok:
+        metrics.inc('buffer_step_failures_total', step=name)
+    return ok
+
+def run_steps(driver, steps, budget, cancelled=None):
+    """Run steps in order until one fails, the budget runs out, or cancelled() is True"""
+    for step, args, failure_message in steps:
+        if cancelled and cancelled():
+            print(f"🛑 Post cancelled before {step.__name__}")
+            return False
+        if budget.exhausted():
+            print(f"⏱️ Post budget of {budget.total:g}s exhausted before {step.__name__}")
+            metrics.inc('buffer_step_failures_total', step=step.__name__)
+            return False
+        if not run_step(driver, step, *args):
+            print(failure_message)
+            return False
+    return True
@@ -0,0 +1,70 @@
+import os
+import sys
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jobqueue
+
+
+def test_expired_lease_on_last_attempt_is_failed(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobqueue, 'MAX_ATTEMPTS', 1)
+    conn = jobqueue.connect(str(tmp_path / "jobs.db"))
+    job_id = jobqueue.enqueue(conn, "clip.mp4")
+
+    # The worker "crashes": its lease expires without complete() or fail()
+    job = jobqueue.lease(conn, "crashed-worker", lease_seconds=-1)
+    assert job['id'] == job_id
+
+    assert jobqueue.lease(conn, "other-worker") is None
+    assert jobqueue.counts(conn) == {'failed': 1}
+
+
+def test_expired_lease_is_retried_by_another_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobqueue, 'MAX_ATTEMPTS', 2)
+    conn = jobqueue.connect(str(tmp_path / "jobs.db"))
+    job_id = jobqueue.enqueue(conn, "clip.mp4")
+
+    jobqueue.lease(conn, "crashed-worker", lease_seconds=-1)
+    job = jobqueue.lease(conn, "other-worker")
+
+    assert job['id'] == job_id
+    assert job['attempts'] == 2
+    assert not jobqueue.heartbeat(conn, job_id, "crashed-worker")
+    assert jobqueue.complete(conn, job_id, "other-worker", "post-1")
+    assert jobqueue.counts(conn) == {'done': 1}
+
+
+def _lease_all(db_path, worker_id, results):
+    conn = jobqueue.connect(db_path)
+    leased = []
+    while True:
+        job = jobqueue.lease(conn, worker_id)
+        if job is None:
+            break
+        leased.append(job['id'])
+        jobqueue.complete(conn, job['id'], worker_id)
+    conn.close()
+    results.put(leased)
+
+
+def test_concurrent_workers_never_lease_the_same_job(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    conn = jobqueue.connect(db_path)
+    job_ids = {jobqueue.enqueue(conn, f"clip{i}.mp4") for i in range(50)}
+
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_lease_all, args=(db_path, f"worker-{i}", results))
+        for i in range(2)
+    ]
+    for process in workers:
+        process.start()
+    leased = [results.get(timeout=60) for _ in workers]
+    for process in workers:
+        process.join()
+
+    all_leased = [job_id for batch in leased for job_id in batch]
+    assert len(all_leased) == len(set(all_leased))
+    assert set(all_leased) == job_ids
+    assert jobqueue.counts(conn) == {'done': 50}
@@ -0,0 +1,154 @@
+import os
+from steps import PostBudget
+
+# Seconds to wait for the composer to confirm the post was created
+VERIFY_TIMEOUT = float(os.getenv('VERIFY_TIMEOUT', '30'))
+# Extra seconds to wait for the network response once the DOM has confirmed
+POST_ID_GRACE = float(os.getenv('POST_ID_GRACE', '3'))
+
+# Hooks fetch/XHR for the composer's create-post request and watches the DOM
+# for the confirmation toast. Installed once per page; results are collected in
+# window.__bufferPostResult.
+WATCHER_SCRIPT = """
+if (window.__bufferPostWatcher) { return false; }
+window.__bufferPostWatcher = true;
+window.__bufferPostResult = {network: null, dom: null};
+
+const CREATE = /createPost|addPost|updates\\/create|posts\\/create/i;
+const CONFIRM = /added to (your )?queue|post (was )?(scheduled|created|shared|published)|great! your post/i;
+// Only toasts and alerts count; queue items re-rendering on the page must not
+const TOAST = '[role="alert"], [role="status"]';
+
+function findId(obj, inPost) {
+    if (!obj || typeof obj !== 'object') { return null; }
+    if (inPost && (typeof obj.id === 'string' || typeof obj.id === 'number')) { return String(obj.id); }
+    for (const [key, value] of Object.entries(obj)) {
+        const id = findId(value, inPost || /post|update/i.test(key));
+        if (id) { return id; }
+    }
+    return null;
+}
+
+function findError(obj) {
+    if (!obj || typeof obj !== 'object') { return null; }
+    if (Array.isArray(obj.errors) && obj.errors.length) { return JSON.stringify(obj.errors).slice(0, 500); }
+    if (typeof obj.__typename === 'string' && /Error$/.test(obj.__typename)) { return obj.message || obj.__typename; }
+    for (const value of Object.values(obj)) {
+        const error = findError(value);
+        if (error) { return error; }
+    }
+    return null;
+}
+
+function inspect(url, body, status, text) {
+    if (window.__bufferPostResult.network) { return; }
+    if (!CREATE.test(url || '') && !CREATE.test(body || '')) { return; }
+    let data = null;
+    try { data = JSON.parse(text); } catch (e) { }
+    const error = status >= 400 ? `HTTP ${status}` : findError(data);
+    window.__bufferPostResult.network = error ? {error: error} : {id: findId(data, false)};
+}
+
+const originalFetch = window.fetch;
+window.fetch = function(input, init) {
+    const url = typeof input === 'string' ? input : (input && input.url) || '';
+    const body = init && typeof init.body === 'string' ? init.body : '';
+    return originalFetch.apply(this, arguments).then(response => {
+        if (CREATE.test(url) || CREATE.test(body)) {
+            response.clone().text().then(text => inspect(url, body, response.status, text), () => {});
+        }
+        return response;
+    });
+};
+
+const originalOpen = XMLHttpRequest.prototype.open;
+const originalSend = XMLHttpRequest.prototype.send;
+XMLHttpRequest.prototype.open = function(method, url) {
+    this.__bufferUrl = String(url);
+    return originalOpen.apply(this, arguments);
+};
+XMLHttpRequest.prototype.send = function(body) {
+    const bodyText = typeof body === 'string' ? body : '';
+    this.addEventListener('load', () => {
+        try { inspect(this.__bufferUrl, bodyText, this.status, this.responseText); } catch (e) { }
+    });
+    return originalSend.apply(this, arguments);
+};
+
+function toastText(node) {
+    // Text can be added to a toast that is already on the page
+    const element = node.nodeType === 1 ? node : node.parentElement;
+    if (!element) { return null; }
+    const toasts = Array.from(element.querySelectorAll(TOAST));
+    const container = element.closest(TOAST);
+    if (container) { toasts.unshift(container); }
+    for (const toast of toasts) {
+        const text = toast.textContent || '';
+        if (CONFIRM.test(text)) { return text.trim().slice(0, 200); }
+    }
+    return null;
+}
+
+new MutationObserver(mutations => {
+    if (window.__bufferPostResult.dom) { return; }
+    for (const mutation of mutations) {
+        const nodes = mutation.type === 'characterData' ? [mutation.target] : mutation.addedNodes;
+        for (const node of nodes) {
+            const text = toastText(node);
+            if (text) {
+                window.__bufferPostResult.dom = {text: text};
+                return;
+            }
+        }
+    }
+}).observe(document.body, {childList: true, characterData: true, subtree: true});
+return true;
+"""
+
+def install_post_watcher(driver):
+    """Install the create-post network hooks and MutationObserver on the current page"""
+    try:
+        if driver.execute_script(WATCHER_SCRIPT):
+            print("👀 Post confirmation watcher installed")
+        return True
+    except Exception as e:
+        print(f"❌ Error installing post watcher: {str(e)}")
+        return False
+
+def _post_confirmed(driver):
+    result = driver.execute_script("return window.__bufferPostResult || null")
+    return result if result and (result['network'] or result['dom']) else False
+
+def _post_response(driver):
+    result = driver.execute_script("return window.__bufferPostResult || null")
+    return result if result and result['network'] else False
+
+def verify_post_created(driver, post, budget=None):
+    """Wait for the composer to confirm the post and store its id in post['id']"""
+    budget = budget or PostBudget()
+    try:
+        print("Waiting for post confirmation...")
+        result = budget.wait(driver, VERIFY_TIMEOUT).until(_post_confirmed)
+
+        # The toast can show up before the response has been read; give it a moment
+        if not result['network']:
+            try:
+                result = budget.wait(driver, POST_ID_GRACE).until(_post_response)
+            except Exception:
+                pass
+
+        network = result['network'] or {}
+        if network.get('error'):
+            print(f"❌ Buffer rejected the post: {network['error']}")
+            return False
+
+        post['id'] = network.get('id')
+        if post['id']:
+            print(f"✅ Post created with id {post['id']}")
+        else:
+            print(f"✅ Post confirmed ({result['dom']['text'] if result['dom'] else 'no id in response'})")
+        return True
+
+    except Exception as e:
+        print(f"❌ Post creation was not confirmed within {VERIFY_TIMEOUT:g}s: {str(e)}")
+        return False
@@ -0,0 +1,193 @@
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import threading
+import importlib.util
+import multiprocessing
+import metrics
+import profiles
+import jobqueue
+
+# "New post.py" can't be imported by name, so load it from its path
+NEW_POST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "New post.py")
+# Seconds to wait before checking an empty queue again
+IDLE_SLEEP = float(os.getenv('IDLE_SLEEP', '5'))
+# Back-off when this host can't start a browser session (doubles up to the max)
+SESSION_RETRY_SLEEP = float(os.getenv('SESSION_RETRY_SLEEP', '30'))
+SESSION_RETRY_MAX = float(os.getenv('SESSION_RETRY_MAX', '600'))
+
+def load_new_post():
+    spec = importlib.util.spec_from_file_location("new_post", NEW_POST_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class Heartbeat(threading.Thread):
+    """Keeps a job's lease alive while the post is running"""
+
+    def __init__(self, db_path, job_id, worker_id):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self):
+        conn = None
+        try:
+            # sqlite connections can't be shared across threads
+            conn = jobqueue.connect(self.db_path)
+            while not self.stopped.wait(jobqueue.LEASE_SECONDS / 3):
+                if not jobqueue.heartbeat(conn, self.job_id, self.worker_id):
+                    print(f"⚠️ Lost lease on job {self.job_id}")
+                    self.lost = True
+                    return
+        except Exception as e:
+            # Without heartbeats the lease will expire, so treat it as lost
+            print(f"⚠️ Heartbeat for job {self.job_id} failed: {str(e)}")
+            self.lost = True
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+def start_session(new_post, account):
+    """Start Chrome and restore the Buffer session"""
+    driver = new_post.setup_chrome(account)
+    if not new_post.load_cookies(driver):
+        driver.quit()
+        raise RuntimeError("No session cookies found. Please run login.py first.")
+    return driver
+
+def run_worker(index=0, db_path=jobqueue.JOBS_DB, forever=False):
+    """Lease and post jobs until the queue is empty (or forever)"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    if metrics.METRICS_PORT:
+        metrics.start_metrics_server(metrics.METRICS_PORT + index)
+    new_post = load_new_post()
+    conn = jobqueue.connect(db_path)
+    # Chrome locks its profile, so each worker gets its own
+    account = profiles.profile_account()
+    if account:
+        account = profiles.worker_account(account, index)
+    state = {'driver': None, 'job': None}
+    session_retry = SESSION_RETRY_SLEEP
+
+    def shutdown(signum, frame):
+        job = state['job']
+        if job:
+            jobqueue.release(conn, job['id'], worker_id)
+            print(f"↩️ Released job {job['id']}")
+        if state['driver']:
+            state['driver'].quit()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    print(f"👷 Worker {worker_id} started")
+    while True:
+        job = jobqueue.lease(conn, worker_id)
+        if job is None:
+            if not forever:
+                break
+            time.sleep(IDLE_SLEEP)
+            continue
+
+        state['job'] = job
+        print(f"📦 Job {job['id']} (attempt {job['attempts']}): {job['video_path']}")
+        beat = Heartbeat(db_path, job['id'], worker_id)
+        beat.start()
+
+        # A host that can't start a session must not burn the job's attempts
+        if state['driver'] is None:
+            try:
+                state['driver'] = start_session(new_post, account)
+                session_retry = SESSION_RETRY_SLEEP
+            except Exception as e:
+                beat.stop()
+                jobqueue.release(conn, job['id'], worker_id)
+                state['job'] = None
+                print(f"❌ Could not start a browser session: {str(e)}")
+                if not forever:
+                    print(f"↩️ Released job {job['id']}, stopping worker")
+                    break
+                print(f"↩️ Released job {job['id']}, retrying in {session_retry:.0f}s")
+                time.sleep(session_retry)
+                session_retry = min(session_retry * 2, SESSION_RETRY_MAX)
+                continue
+
+        try:
+            network = job['network'] or new_post.captions.NETWORK
+            # Abandon the post if another worker has taken the job over
+            post = new_post.create_post(state['driver'], job['video_path'], network=network,
+                                        cancelled=lambda: beat.lost)
+            ok = post is not None
+            error = None if ok else "Posting step failed"
+        except Exception as e:
+            post, ok = None, False
+            error = str(e)
+        beat.stop()
+
+        # complete() and fail() only match our own lease, which may have expired meanwhile
+        if beat.lost:
+            # Another worker has taken the job over; don't touch its state
+            print(f"⚠️ Job {job['id']} abandoned, its lease was lost")
+        elif ok:
+            if jobqueue.complete(conn, job['id'], worker_id, post['id']):
+                print(f"✅ Job {job['id']} done (post {post['id'] or 'id unknown'})")
+            else:
+                print(f"⚠️ Job {job['id']} was posted (post {post['id'] or 'id unknown'}) "
+                      f"but its lease was lost; another worker may post it again")
+        else:
+            if jobqueue.fail(conn, job['id'], worker_id, error):
+                print(f"❌ Job {job['id']} failed: {error}")
+            else:
+                print(f"⚠️ Job {job['id']} failed ({error}) after its lease was lost")
+        state['job'] = None
+
+        # A failed post can leave the composer in a bad state; start fresh next time
+        if not ok and state['driver'] is not None:
+            state['driver'].quit()
+            state['driver'] = None
+
+    if state['driver']:
+        state['driver'].quit()
+    conn.close()
+    print(f"👋 Worker {worker_id} finished")
+
+def main():
+    parser = argparse.ArgumentParser(description="Post queued videos to Buffer")
+    parser.add_argument('--processes', type=int, default=1, help="worker processes to run on this host")
+    parser.add_argument('--db', default=jobqueue.JOBS_DB, help="path to the shared job database")
+    parser.add_argument('--forever', action='store_true', help="keep polling when the queue is empty")
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        run_worker(0, args.db, args.forever)
+        return
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(i, args.db, args.forever))
+        for i in range(args.processes)
+    ]
+    for process in workers:
+        process.start()
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.join()
+
+if __name__ == "__main__":
+    main()